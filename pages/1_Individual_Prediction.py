@@ -1,57 +1,21 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.kernel_ridge import KernelRidge
 from sklearn.metrics import accuracy_score, confusion_matrix
-import matplotlib.pyplot as plt
-from joblib import load
 import plotly.graph_objects as go
 import plotly.io as pio
 import time
-from explainerdashboard import ClassifierExplainer, ExplainerDashboard
-from explainerdashboard.dashboard_components import ImportancesComponent, ShapContributionsTableComponent, ShapContributionsGraphComponent
-from sklearn.preprocessing import LabelEncoder
 import streamlit.components.v1 
+from utils.model import load_data, get_label_encoder, get_split, get_trained_model, build_explainer
 
 # st.set_option('deprecation.showPyplotGlobalUse', False)
 
-# Load dataset
-@st.cache_data
-def load_data():
-    df = pd.read_csv("./Maternal Health Risk Data Set.csv")
-    target = 'RiskLevel'
-    return df, target
-
-# Train Logistic Regression model
-@st.cache_resource
-def load_model():
-    model = load("./random_forest_model.pkl")
-    return model
-    
 def main():
     df_og, target = load_data()
-    label_encoder = LabelEncoder()
+    label_encoder = get_label_encoder(df_og[target])
     df = df_og.copy()
-    df[target] = label_encoder.fit_transform(df[target])
-    X = df.drop(target, axis=1)
-    y = df[target]
-    
-    if 'X_train' not in st.session_state:
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=7)
-        st.session_state.X_train = X_train
-        st.session_state.y_train = y_train
-        st.session_state.X_test = X_test
-        st.session_state.y_test = y_test
-    else:
-        X_train = st.session_state.X_train
-        y_train = st.session_state.y_train
-        X_test = st.session_state.X_test
-        y_test = st.session_state.y_test
-        if y_train.dtype == object: # useful if we go to about model first and then come here
-            y_train = label_encoder.transform(y_train)
-            y_test = label_encoder.transform(y_test)
+    df[target] = label_encoder.transform(df[target])
+    X_train, X_test, y_train, y_test = get_split(df, target, test_size=0.2, seed=7)
     
     st.header("Individual Prediction", anchor="individual-prediction")
     st.title("Maternal Health Risk Prediction")
@@ -61,16 +25,12 @@ def main():
     )
     st.write("This page enables the examination of the prediction and the contribution of each feature to the prediction for an individual sample.")
         
-    model = load_model()
-    model = model.fit(X_train, y_train)
+    model, _ = get_trained_model(X_train, y_train)
             
     with st.spinner(text='Loading Explainer...'):
-            if 'explainer' not in st.session_state:
-                explainer = ClassifierExplainer(model, X_test, y_test)
-                st.session_state.explainer = explainer
-                explainer.dump("./explainer.joblib")
-            else:
-                explainer = ClassifierExplainer.from_file("./explainer.joblib")
+            # imported here so the page header renders before the heavy explainerdashboard import
+            from explainerdashboard.dashboard_components import ShapContributionsTableComponent, ShapContributionsGraphComponent
+            explainer = build_explainer(model, X_test, y_test)
        
     st.toast('Explainer ready 🔬', icon="✔️")
      
@@ -1,37 +1,17 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.kernel_ridge import KernelRidge
 from sklearn.metrics import accuracy_score, confusion_matrix
-import matplotlib.pyplot as plt
-from joblib import load
 import plotly.graph_objects as go
 import plotly.io as pio
 import time
-from explainerdashboard import ClassifierExplainer, ExplainerDashboard
-from explainerdashboard.dashboard_components import *
-from sklearn.preprocessing import LabelEncoder
 import streamlit.components.v1 
 import plotly.graph_objects as go
 import plotly.io as pio
+from utils.model import load_data, get_label_encoder, get_split, get_trained_model
 
 # st.set_option('deprecation.showPyplotGlobalUse', False)
 
-# Load dataset
-@st.cache_data
-def load_data():
-    df = pd.read_csv("./Maternal Health Risk Data Set.csv")
-    target = 'RiskLevel'
-    return df, target
-
-# Train Logistic Regression model
-@st.cache_resource
-def load_model():
-    model = load("./random_forest_model.pkl")
-    return model
-
 def create_pie_chart(predictions, title):
     labels = ['High Risk', 'Low Risk', 'Mid Risk']
 
@@ -59,25 +39,11 @@ def create_pie_chart(predictions, title):
     
 def main():
     df, target = load_data()
-    label_encoder = LabelEncoder()
-    df[target] = label_encoder.fit_transform(df[target])
+    label_encoder = get_label_encoder(df[target])
+    df[target] = label_encoder.transform(df[target])
     X = df.drop(target, axis=1)
-    y = df[target]
     
-    if 'X_train' not in st.session_state:
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=7)
-        st.session_state.X_train = X_train
-        st.session_state.y_train = y_train
-        st.session_state.X_test = X_test
-        st.session_state.y_test = y_test
-    else:
-        X_train = st.session_state.X_train
-        y_train = st.session_state.y_train
-        X_test = st.session_state.X_test
-        y_test = st.session_state.y_test
-        if y_train.dtype == object: # useful if we go to about model first and then come here
-            y_train = label_encoder.transform(y_train)
-            y_test = label_encoder.transform(y_test)
+    X_train, X_test, y_train, y_test = get_split(df, target, test_size=0.2, seed=7)
     
     st.header("Prediction Simulator", anchor="prediction-simulator")
     st.title("Maternal Health Risk Prediction")
@@ -95,8 +61,7 @@ def main():
     st.write("Select a *mother_id* from the sidebar and change the values for the measurements to simulate the health risk prediction. The model prediction will be updated accordingly.")
     st.write("The new sample values are displayed below, alongwith the change from the original sample values. (they can be reset to original values by clicking the `Reset` button in the sidebar)")
     
-    model = load_model()
-    model = model.fit(X_train, y_train) 
+    model, _ = get_trained_model(X_train, y_train)
     
     if 'predicted_probs' not in st.session_state:
         pred_probs = model.predict_proba(X_test)
@@ -105,13 +70,6 @@ def main():
     else:
         pred_probs = st.session_state.predicted_probs
     
-    if 'explainer' not in st.session_state:
-        explainer = ClassifierExplainer(model, X_test, y_test)
-        st.session_state.explainer = explainer
-        explainer.dump("./explainer.joblib")
-    else:
-        explainer = ClassifierExplainer.from_file("./explainer.joblib")
-    
     index = st.sidebar.selectbox("Select a `mother_id` to view and modify", options=range(len(X_test)))
     st.write(f"🧸 **Selected *mother_id*: {index}**")
 
@@ -4,10 +4,7 @@ import numpy as np
 import plotly.express as px
 import time
 from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.kernel_ridge import KernelRidge
 from sklearn.metrics import accuracy_score, confusion_matrix
-import matplotlib.pyplot as plt
 
 # st.set_option('deprecation.showPyplotGlobalUse', False)
 
@@ -19,7 +16,7 @@ st.set_page_config(
 )
 
 # Load dataset
-@st.cache_data
+@st.cache_data(persist="disk")
 def load_data():
     df = pd.read_csv("./Maternal Health Risk Data Set.csv")
     target = 'RiskLevel'
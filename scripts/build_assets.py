@@ -0,0 +1,27 @@
+# Pre-renders the static assets served by the app, so the pages do not have to
+# build a ClassifierExplainer at runtime. Re-run from the repository root after
+# changing the dataset or the model hyperparameters:
+#
+#   python -m scripts.build_assets
+
+from explainerdashboard.dashboard_components import ImportancesComponent
+from utils.model import load_data, get_label_encoder, get_split, get_trained_model, build_explainer
+
+IMPORTANCES_PATH = "./importances.html"
+
+def build_importances_html(path=IMPORTANCES_PATH):
+    # same encoding, split and model as the About the Model page
+    df, target = load_data()
+    label_encoder = get_label_encoder(df[target])
+    df[target] = label_encoder.transform(df[target])
+    X_train, X_test, y_train, y_test = get_split(df, target, test_size=0.2, seed=7)
+    model, _ = get_trained_model(X_train, y_train)
+    explainer = build_explainer(model, X_test, y_test)
+
+    importances_html = ImportancesComponent(explainer, hide_title=True).to_html()
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(importances_html)
+    print(f"Wrote {path}")
+
+if __name__ == "__main__":
+    build_importances_html()
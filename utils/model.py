@@ -0,0 +1,87 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from sklearn.model_selection import train_test_split
+from sklearn.metrics import confusion_matrix
+from sklearn.preprocessing import LabelEncoder
+from sklearn.ensemble import RandomForestClassifier
+import plotly.express as px
+import time
+
+# Shared data and model helpers. Keeping the cached functions in one module lets
+# every page hit the same cache entries instead of each page building its own copy.
+
+# Compact column types: the vitals are whole numbers apart from BS and BodyTemp
+DTYPES = {
+    "Age": np.int16,
+    "SystolicBP": np.int16,
+    "DiastolicBP": np.int16,
+    "BS": np.float64,
+    "BodyTemp": np.float64,
+    "HeartRate": np.int16,
+    "RiskLevel": "category",
+}
+
+# Hyperparameters from the GridSearchCV tuning listed on the About the Model page,
+# seeded so the pre-rendered assets in scripts/build_assets.py match the served model
+MODEL_PARAMS = {
+    "criterion": "log_loss",
+    "max_depth": 15,
+    "max_features": "log2",
+    "n_estimators": 100,
+    "random_state": 7,
+}
+
+# Load dataset
+@st.cache_data(persist="disk")
+def load_data():
+    df = pd.read_csv("./Maternal Health Risk Data Set.csv", dtype=DTYPES)
+    target = 'RiskLevel'
+    return df, target
+
+# Fit the label encoder once on all target values so every split shares the same mapping
+@st.cache_resource
+def get_label_encoder(y):
+    return LabelEncoder().fit(y)
+
+# Split the data once per dataset and seed
+@st.cache_data
+def get_split(df, target, test_size, seed):
+    X = df.drop(target, axis=1)
+    y = df[target]
+    return train_test_split(X, y, test_size=test_size, random_state=seed)
+
+# Build the tuned Random Forest and fit it once per training split
+@st.cache_resource(show_spinner=False)
+def get_trained_model(X_train, y_train):
+    # predictions here are small batches, where joblib worker start-up dominates
+    model = RandomForestClassifier(**MODEL_PARAMS, n_jobs=1, verbose=0)
+    start_time = time.time()
+    model.fit(X_train, y_train)
+    training_time = time.time() - start_time
+    return model, training_time
+
+# Build the SHAP explainer once per test split; the fitted model is excluded from hashing
+@st.cache_resource(show_spinner=False)
+def build_explainer(_model, X_test, y_test):
+    # explainerdashboard pulls in dash, flask and shap, so only import it once an explainer is needed
+    from explainerdashboard import ClassifierExplainer
+    return ClassifierExplainer(_model, X_test, y_test, shap='tree', model_output='probability')
+
+# Build the confusion matrix figure once per set of labels
+@st.cache_data(show_spinner=False)
+def build_cm_figure(y_true, y_pred):
+    cm = confusion_matrix(y_true, y_pred)
+    # imshow keeps the rows top-down and labels cells from z, so the matrix is sent once
+    fig = px.imshow(cm,
+                    x=['High Risk', 'Low Risk', 'Medium Risk'],
+                    y=['High Risk', 'Low Risk', 'Medium Risk'],
+                    color_continuous_scale="blues",
+                    text_auto=True,
+                    aspect="auto")
+
+    fig.update_layout(
+        title='Confusion Matrix',
+        xaxis_title="Predicted",
+        yaxis_title="True")
+    return fig